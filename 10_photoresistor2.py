@@ -1,42 +1,57 @@
 #!/usr/bin/env python3
 # Replacement for ADC0832 version -- works with PCF8591 used in Adeept kits
 
-import smbus
+from i2c_bus import get_bus, close_bus
+from smbus2 import i2c_msg
+import sys
 import time
 
 # PCF8591 info
-I2C_BUS = 1
 PCF8591_ADDR = 0x48
 CHAN_A0 = 0x40  # Channel 0
+_CHAN_BYTES = (CHAN_A0, 0x41, 0x42, 0x43)   # control byte for A0-A3
+SAMPLES = 8     # samples averaged per reading (at most 31)
 
-bus = smbus.SMBus(I2C_BUS)
+# Select a channel and read two bytes in one combined transaction; the
+# first byte is the stale conversion, the second is the fresh sample
+_msg_w = [i2c_msg.write(PCF8591_ADDR, [c]) for c in _CHAN_BYTES]
+_msg_r = i2c_msg.read(PCF8591_ADDR, 2)
 
 def init():
     # No setup needed for PCF8591, but we keep this for compatibility
     print("PCF8591 ready")
 
-def getValue():
-    # Select channel A0
-    bus.write_byte(PCF8591_ADDR, CHAN_A0)
-    bus.read_byte(PCF8591_ADDR)       # Dummy read required
-    value = bus.read_byte(PCF8591_ADDR)
-    return value
+def _checkChan(chan):
+    if not 0 <= chan < len(_CHAN_BYTES):
+        raise ValueError("chan must be 0-%d" % (len(_CHAN_BYTES) - 1))
+
+def getValue(chan=0):
+    _checkChan(chan)
+    get_bus().i2c_rdwr(_msg_w[chan], _msg_r)
+    data = list(_msg_r)
+    return data[1]
+
+def getValues(n, chan=0):
+    _checkChan(chan)
+    # One block read: the first byte is the conversion left over from the
+    # previous read, each byte after it is a fresh sample
+    data = get_bus().read_i2c_block_data(PCF8591_ADDR, _CHAN_BYTES[chan], n + 1)
+    return bytes(data[1:])
 
 def loop():
+    # Line-buffered once, so each reading shows up even when piped, and
+    # written directly rather than through print()
+    sys.stdout.reconfigure(line_buffering=True)
+    write = sys.stdout.write
     while True:
-        raw = getValue()              # 0–255
-        res = raw - 80                # mimic your original logic
-
-        if res < 0:
-            res = 0
-        if res > 100:
-            res = 100
+        raw = sum(getValues(SAMPLES)) // SAMPLES   # 0–255
+        res = 0 if raw < 80 else min(raw - 80, 100)   # mimic your original logic
 
-        print(f"res = {res}")
+        write(f"res = {res}\n")
         time.sleep(0.2)
 
 def destroy():
-    bus.close()
+    close_bus()
     print("The end!")
 
 if __name__ == '__main__':
@@ -1,14 +1,32 @@
 
+import os
+import selectors
 import socket
 import sys
 
 # --- Configuration ---
 HOST = "192.168.0.48"   # <-- Replace with your Raspberry Pi's IP or hostname
 PORT = 8080            # <-- Must match the server port
+BUFSIZ = 16384         # Bytes read per recv() call
+SOCK_BUF = None        # SO_SNDBUF/SO_RCVBUF in bytes; None keeps kernel autotuning.
+                       # Try 262144 only on a high bandwidth x RTT link.
+LINGER = 1.0           # Seconds without a reply before exiting after 'bye'
+
+# Common commands, encoded once
+CMDS = {"on": b"on\n", "off": b"off\n", "bye": b"bye\n"}
 
 def main():
     # Create a TCP client socket
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as tcpCliSock:
+        # Buffer sizes must be set before connect() to affect the TCP window.
+        # A fixed size turns off receive autotuning, so it only pays off when
+        # bandwidth x RTT is above the kernel's ~87 KB default.
+        if SOCK_BUF is not None:
+            tcpCliSock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCK_BUF)
+            tcpCliSock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCK_BUF)
+        # Send short commands like "on\n" at once instead of waiting on Nagle
+        tcpCliSock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
         try:
             print(f"Connecting to {HOST}:{PORT} ...")
             tcpCliSock.connect((HOST, PORT))
@@ -18,36 +36,13 @@ def main():
             sys.exit(1)
 
         try:
-            while True:
-                # Get command from the user (Python 3 returns str)
-                cmd = input("Input command: ").strip()
-
-                if not cmd:
-                    # Ignore empty lines
-                    continue
-
-                # Send bytes over the socket (encode to UTF-8)
-                tcpCliSock.send((cmd + "\n").encode("utf-8"))
-
-                # If we plan to close after 'bye', optionally break after reading server reply
-                if cmd.lower() == "bye":
-                    # Read final response (if any) then exit loop
-                    try:
-                        data = tcpCliSock.recv(1024)
-                        if data:
-                            print("Server:", data.decode("utf-8", errors="replace").strip())
-                    except Exception:
-                        pass
-                    break
-
-                # Receive response from server (bytes) and decode to str
-                data = tcpCliSock.recv(1024)
-                if not data:
-                    print("Server closed the connection.")
-                    break
-
-                reply = data.decode("utf-8", errors="replace").strip()
-                print("Server:", reply)
+            # Windows can only select() on sockets, not on the console, so
+            # it keeps the one-command-one-reply loop (as does redirected
+            # file input elsewhere, see select_loop())
+            if os.name == "nt":
+                prompt_loop(tcpCliSock)
+            else:
+                select_loop(tcpCliSock)
 
         except KeyboardInterrupt:
             print("\n[Interrupted] Closing client.")
@@ -57,5 +52,107 @@ def main():
             # Socket is auto-closed by the context manager
             pass
 
+def encode(cmd):
+    # Send bytes over the socket (encode to UTF-8)
+    return CMDS.get(cmd) or (cmd + "\n").encode("utf-8")
+
+def prompt_loop(tcpCliSock):
+    while True:
+        # Get command from the user (Python 3 returns str)
+        cmd = input("Input command: ").strip()
+
+        if not cmd:
+            # Ignore empty lines
+            continue
+
+        # sendall() retries if the send buffer is full
+        tcpCliSock.sendall(encode(cmd))
+
+        # If we plan to close after 'bye', optionally break after reading server reply
+        if cmd.lower() == "bye":
+            # Read final response (if any) then exit loop
+            try:
+                data = tcpCliSock.recv(BUFSIZ)
+                if data:
+                    print("Server:", data.decode("utf-8", errors="replace").strip())
+            except Exception:
+                pass
+            break
+
+        # Receive response from server (bytes) and decode to str
+        data = tcpCliSock.recv(BUFSIZ)
+        if not data:
+            print("Server closed the connection.")
+            break
+
+        reply = data.decode("utf-8", errors="replace").strip()
+        print("Server:", reply)
+
+def select_loop(tcpCliSock):
+    # Wait on the keyboard and the socket together, so replies (or
+    # messages the server sends on its own) are shown as they arrive
+    # instead of only after the next command is typed.
+    with selectors.DefaultSelector() as sel:
+        try:
+            sel.register(sys.stdin, selectors.EVENT_READ)
+        except (OSError, ValueError):
+            # epoll can't wait on a regular file (e.g. "< cmds.txt"), which
+            # is always readable anyway: fall back to one command, one reply
+            return prompt_loop(tcpCliSock)
+        sel.register(tcpCliSock, selectors.EVENT_READ)
+
+        print("Input command: ", end="", flush=True)
+        stdin_fd = sys.stdin.fileno()
+        pending = b""
+        closing = False
+        while True:
+            # Once no more commands will be sent, keep printing replies
+            # until the server closes or goes quiet for LINGER seconds
+            events = sel.select(LINGER if closing else None)
+            if not events:
+                return
+            for key, _ in events:
+                if key.fileobj is sys.stdin:
+                    # Read the fd directly: sys.stdin's own buffer could hold
+                    # lines that select() can't see until more input arrives
+                    chunk = os.read(stdin_fd, 4096)
+                    if not chunk:
+                        # End of input (Ctrl+D): send an unfinished last line
+                        closing = True
+                        chunk = b"\n" if pending else b""
+                    pending += chunk
+                    *lines, pending = pending.split(b"\n")
+
+                    for line in lines:
+                        cmd = line.decode("utf-8", errors="replace").strip()
+                        if not cmd:
+                            # Ignore empty lines
+                            print("Input command: ", end="", flush=True)
+                            continue
+
+                        # sendall() retries if the send buffer is full
+                        tcpCliSock.sendall(encode(cmd))
+
+                        # After 'bye', stop reading commands and wait for
+                        # the replies still on their way
+                        if cmd.lower() == "bye":
+                            closing = True
+                            break
+                    if closing:
+                        sel.unregister(sys.stdin)
+
+                elif key.fileobj is tcpCliSock:
+                    # Receive response from server (bytes) and decode to str
+                    data = tcpCliSock.recv(BUFSIZ)
+                    if not data:
+                        if not closing:
+                            print("\nServer closed the connection.")
+                        return
+
+                    reply = data.decode("utf-8", errors="replace").strip()
+                    print("Server:", reply)
+                    if not closing:
+                        print("Input command: ", end="", flush=True)
+
 if __name__ == "__main__":
     main()
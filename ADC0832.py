@@ -1,64 +1,374 @@
 #!/usr/bin/env python
 import RPi.GPIO as GPIO
+import functools
+import os
 import time
 
+try:
+	import spidev
+except ImportError:
+	spidev = None
+
+try:
+	import pigpio
+except ImportError:
+	pigpio = None
+
+try:
+	import lgpio
+except ImportError:
+	lgpio = None
+
 ADC_CS  = 11
 ADC_CLK = 12
 ADC_DIO = 13
 
+# How the ADC0832 is read.  'bitbang' (RPi.GPIO) and 'lgpio' use the lab
+# wiring on the pins above; 'spi' and 'pigpio' need the extra wiring
+# described below.  Nothing is picked from what happens to be installed or
+# running, only from this.
+BACKEND = 'bitbang'
+_BACKENDS = ('bitbang', 'lgpio', 'spi', 'pigpio')
+
+# Hardware SPI wiring: CS -> CE0 (pin 24), CLK -> SCLK (pin 23),
+# DIO -> MISO (pin 21) and, through a 1k resistor, to MOSI (pin 19).
+SPI_BUS    = 0
+SPI_DEVICE = 0
+SPI_SPEED  = 400000    # ADC0832 max clock is 400kHz
+
+# With BACKEND = 'spi' the hardware clocks the frame and the sample is read
+# once.  Set VALIDATE to also read the LSB-first copy and return 0 on a
+# mismatch, as the other backends always do.
+VALIDATE = False
+
+# pigpio and lgpio use BCM numbers for ADC_CS, ADC_CLK and ADC_DIO
+BCM_CS  = 17    # pin 11
+BCM_CLK = 18    # pin 12
+BCM_DIO = 27    # pin 13
+
+# With 'pigpio', a running pigpiod clocks the SPI frame out on the lab pins.
+# It needs a separate MOSI line: join pin 15 to DIO through a 1k resistor.
+PIGPIO_MOSI = 22    # pin 15
+PIGPIO_BAUD = 250000
+
+# 'lgpio' bit-bangs the same frame through /dev/gpiochip*, which also works
+# on the Pi 5 (RP1 is gpiochip4 on older kernels, gpiochip0 on newer ones).
+# CS and CLK are driven push-pull; DIO is claimed open-drain with the
+# internal pull-up, so it never has to change direction.
+LGPIO_CHIPS = (4, 0)
+
+# real-time priority for the RPi.GPIO bit-bang reads, see _realtime()
+RT_PRIORITY = 20
+RT_CPU = None    # e.g. 3, to pin to that core
+
+_T = 2000        # bit-bang half clock period, in nanoseconds
+
+SAMPLES = 4      # samples averaged per reading in loop()
+
+# start, SGL (single-ended) and ODD/SIGN bits for each channel
+_CONTROL_BITS = {
+	0: (GPIO.HIGH, GPIO.HIGH, GPIO.LOW),
+	1: (GPIO.HIGH, GPIO.HIGH, GPIO.HIGH),
+}
+
+# the same bits as the first byte of an SPI frame, see _decode()
+_SPI_FRAMES = dict((ch, [0xC0 | ch << 5, 0]) for ch in _CONTROL_BITS)
+_SPI_FRAMES_VALIDATE = dict((ch, [0xC0 | ch << 5, 0, 0]) for ch in _CONTROL_BITS)
+
+_BACKEND = 'bitbang'
+_spi = None
+_pi = None
+_lg_h = None
+_saved_sched = None    # scheduler state before _realtime()
+
+# bit-bang driver, filled in by setup()
+_out = _inp = _start = _finish = None
+_CLK = _DIO = None
+
+# time.sleep() can't wait 2us: the scheduler wakes it up 50-100us later, so
+# the bit-bang half periods busy-wait on the clock instead
+if hasattr(time, 'perf_counter_ns'):
+	def _spin(ns, _t=time.perf_counter_ns):
+		end = _t() + ns
+		while _t() < end:
+			pass
+else:
+	def _spin(ns, _t=getattr(time, 'perf_counter', time.time)):
+		end = _t() + ns * 1e-9
+		while _t() < end:
+			pass
+
+# bit-reversal of a byte, for the LSB-first copy of the sample
+_REVERSE = [int('{:08b}'.format(i)[::-1], 2) for i in range(256)]
+
 def setup():
+	global _BACKEND, _spi, _pi, _lg_h
+	global _out, _inp, _start, _finish, _CLK, _DIO
+	if BACKEND not in _BACKENDS:
+		raise ValueError('BACKEND must be one of %s' % ', '.join(_BACKENDS))
+
+	if BACKEND == 'spi':
+		if spidev is None:
+			raise RuntimeError("BACKEND = 'spi' needs the spidev module")
+		_spi = spidev.SpiDev()
+		_spi.open(SPI_BUS, SPI_DEVICE)    # fails if SPI is not enabled
+		_spi.max_speed_hz = SPI_SPEED
+		_spi.mode = 0
+		_BACKEND = 'spi'
+		return
+
+	if BACKEND == 'pigpio':
+		if pigpio is None:
+			raise RuntimeError("BACKEND = 'pigpio' needs the pigpio module")
+		_pi = pigpio.pi()
+		if not _pi.connected:
+			_pi = None
+			raise RuntimeError("BACKEND = 'pigpio' needs pigpiod running")
+		_pi.bb_spi_open(BCM_CS, BCM_DIO, PIGPIO_MOSI, BCM_CLK,
+			PIGPIO_BAUD, 0)
+		_BACKEND = 'pigpio'
+		return
+
+	if BACKEND == 'lgpio':
+		if lgpio is None:
+			raise RuntimeError("BACKEND = 'lgpio' needs the lgpio module")
+		_lg_h = _openChip()
+		if _lg_h is None:
+			raise RuntimeError("BACKEND = 'lgpio' found no gpiochip in LGPIO_CHIPS")
+		lgpio.gpio_claim_output(_lg_h, BCM_CS, 1)
+		lgpio.gpio_claim_output(_lg_h, BCM_CLK, 0)
+		lgpio.gpio_claim_output(_lg_h, BCM_DIO, 1,
+			lgpio.SET_OPEN_DRAIN | lgpio.SET_PULL_UP)
+		_out = functools.partial(lgpio.gpio_write, _lg_h)
+		_inp = functools.partial(lgpio.gpio_read, _lg_h)
+		_start, _finish = _lgStart, _lgFinish
+		_CLK, _DIO = BCM_CLK, BCM_DIO
+		_BACKEND = 'lgpio'
+		return
+
+	_BACKEND = 'bitbang'
 	GPIO.setwarnings(False)
 	GPIO.setmode(GPIO.BOARD)    #Number GPIOs by its physical location
 	GPIO.setup(ADC_CS, GPIO.OUT)
 	GPIO.setup(ADC_CLK, GPIO.OUT)
+	GPIO.setup(ADC_DIO, GPIO.OUT)    # DIO idles as an output between reads
+	_out = GPIO.output
+	_inp = GPIO.input
+	_start, _finish = _gpioStart, _gpioFinish
+	_CLK, _DIO = ADC_CLK, ADC_DIO
+	_realtime()
+
+def _realtime():
+	# The RPi.GPIO bit-bang timing only holds if nothing preempts us between
+	# edges, so run as a SCHED_FIFO task (needs root or CAP_SYS_NICE;
+	# otherwise the default scheduler is kept) until destroy().  RT_CPU
+	# optionally pins the process to one core, ideally one kept free of other
+	# work with isolcpus= at boot.  The 'lgpio' backend keeps the default
+	# scheduler.
+	global _saved_sched
+	try:
+		saved = (os.sched_getscheduler(0), os.sched_getparam(0),
+			os.sched_getaffinity(0))
+		os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(RT_PRIORITY))
+		_saved_sched = saved
+		if RT_CPU is not None:
+			os.sched_setaffinity(0, [RT_CPU])
+	except (AttributeError, OSError):
+		pass
+
+def _restoreSched():
+	global _saved_sched
+	if _saved_sched is None:
+		return
+	policy, param, cpus = _saved_sched
+	_saved_sched = None
+	try:
+		os.sched_setscheduler(0, policy, param)
+		os.sched_setaffinity(0, cpus)
+	except OSError:
+		pass
+
+def _openChip():
+	for chip in LGPIO_CHIPS:
+		try:
+			return lgpio.gpiochip_open(chip)
+		except lgpio.error:
+			pass
+	return None
 
 def destroy():
-	GPIO.cleanup()
+	if _BACKEND == 'spi':
+		_spi.close()
+	elif _BACKEND == 'pigpio':
+		_pi.bb_spi_close(BCM_CS)
+		_pi.stop()
+	elif _BACKEND == 'lgpio':
+		lgpio.gpiochip_close(_lg_h)
+	else:
+		GPIO.cleanup()
+		_restoreSched()
 
-def getResult():     # get ADC result
-	GPIO.setup(ADC_DIO, GPIO.OUT)
-	GPIO.output(ADC_CS, 0)
-	
-	GPIO.output(ADC_CLK, 0)
-	GPIO.output(ADC_DIO, 1);  time.sleep(0.000002)
-	GPIO.output(ADC_CLK, 1);  time.sleep(0.000002)
-	GPIO.output(ADC_CLK, 0)
+def getResult(channel=0):     # get ADC result
+	if channel not in _CONTROL_BITS:
+		raise ValueError('channel must be 0 or 1')
+	if _BACKEND == 'spi':
+		res = _spiResult(channel)
+	elif _BACKEND == 'pigpio':
+		res = _pigpioResult(channel)
+	else:
+		res = _bitbangResult(channel)
+	# the backends return -1 when the two copies of the sample disagree
+	if res < 0:
+		return 0
+	return res
 
-	GPIO.output(ADC_DIO, 1);  time.sleep(0.000002)
-	GPIO.output(ADC_CLK, 1);  time.sleep(0.000002)
-	GPIO.output(ADC_CLK, 0)
+def getResults(n, channel=0):     # get up to n ADC results back to back, as bytes
+	if channel not in _CONTROL_BITS:
+		raise ValueError('channel must be 0 or 1')
+	if _BACKEND == 'spi':
+		read = _spiResult
+	elif _BACKEND == 'pigpio':
+		read = _pigpioResult
+	else:
+		read = _bitbangResult
+	# the ADC0832 converts once per CS cycle, so each sample still needs
+	# its own start sequence; only the dispatch is shared.  Samples whose
+	# two copies disagree are dropped, so fewer than n may come back.
+	samples = [read(channel) for _ in range(n)]
+	return bytes(bytearray([s for s in samples if s >= 0]))
 
-	GPIO.output(ADC_DIO, 0);  time.sleep(0.000002)
+def _spiResult(channel):
+	return _decode(_spi.xfer2(_frame(channel)))
 
-	GPIO.output(ADC_CLK, 1)
-	GPIO.output(ADC_DIO, 1);  time.sleep(0.000002)
-	GPIO.output(ADC_CLK, 0)
-	GPIO.output(ADC_DIO, 1);  time.sleep(0.000002)
-	
-	dat1 = 0
-	for i in range(0, 8):
-		GPIO.output(ADC_CLK, 1);  time.sleep(0.000002)
-		GPIO.output(ADC_CLK, 0);  time.sleep(0.000002)
-		GPIO.setup(ADC_DIO, GPIO.IN)
-		dat1 = dat1 << 1 | GPIO.input(ADC_DIO)  # or ?
-	
-	dat2 = 0
-	for i in range(0, 8):
-		dat2 = dat2 | GPIO.input(ADC_DIO) << i
-		GPIO.output(ADC_CLK, 1);  time.sleep(0.000002)
-		GPIO.output(ADC_CLK, 0);  time.sleep(0.000002)
+def _pigpioResult(channel):
+	# software-clocked, so always check the LSB-first copy
+	tx = _SPI_FRAMES_VALIDATE[channel]
+	count, rx = _pi.bb_spi_xfer(BCM_CS, tx)
+	if count != len(tx):
+		return -1
+	return _decode(rx)
+
+# Clocks 1-3 send start, SGL and ODD/SIGN, clock 4 lets the mux settle,
+# clocks 5-12 return the sample MSB first and 12-19 repeat it LSB first.
+# Two bytes are enough for the sample; the third holds the LSB-first copy.
+
+def _frame(channel):
+	if VALIDATE:
+		return _SPI_FRAMES_VALIDATE[channel]
+	return _SPI_FRAMES[channel]
+
+def _decode(rx):
+	if len(rx) == 2:
+		return (rx[0] << 8 | rx[1]) >> 4 & 0xFF
+
+	frame = rx[0] << 16 | rx[1] << 8 | rx[2]
+	dat1 = frame >> 12 & 0xFF
+	dat2 = _REVERSE[frame >> 5 & 0xFF]
+
+	if dat1 == dat2:
+		return dat1
+	else:
+		return -1
+
+# Each bit-bang driver has a _start() that drops CS, clocks out the control
+# bits and leaves DIO free for the ADC to drive, and a _finish() that raises
+# CS and puts DIO back to idle.
+
+def _gpioStart(channel):
+	out = GPIO.output; spin = _spin
+	clk = ADC_CLK; dio = ADC_DIO; T = _T
+
+	out(ADC_CS, 0)
 	
+	out(clk, 0)
+	for bit in _CONTROL_BITS[channel]:
+		out(dio, bit)
+		out(clk, 1);  spin(T)
+		out(clk, 0);  spin(T)
+
+	GPIO.setup(dio, GPIO.IN)
+
+def _gpioFinish():
 	GPIO.output(ADC_CS, 1)
 	GPIO.setup(ADC_DIO, GPIO.OUT)
 
+def _lgStart(channel):
+	# DIO is open-drain, so writing it high only releases it: once the
+	# control bits are out the ADC can drive the line and gpio_read() sees
+	# its level, with no change of direction.  CLK stays push-pull and
+	# can't share a line group (and so a tx_wave) with DIO, so the bits are
+	# clocked out one write at a time as in _gpioStart().
+	h = _lg_h; out = lgpio.gpio_write; spin = _spin
+	clk = BCM_CLK; dio = BCM_DIO; T = _T
+
+	out(h, BCM_CS, 0)
+
+	for bit in _CONTROL_BITS[channel]:
+		out(h, dio, bit)
+		out(h, clk, 1);  spin(T)
+		out(h, clk, 0);  spin(T)
+
+	out(h, dio, 1)    # release DIO to the ADC
+
+def _lgFinish():
+	lgpio.gpio_write(_lg_h, BCM_CS, 1)
+
+# The sample reads are the only per-bit loops.  They take the driver's
+# write/read callables and pins as arguments so that _adc_native, a Cython
+# build of the same two functions, can replace them when it is available.
+
+def _readMsb(out, inp, clk, dio, T):
+	# bind everything the edges touch to locals, each edge is a Python call
+	spin = _spin
+	# MSB first: b7 follows the mux settling clock
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  b7 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  b6 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  b5 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  b4 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  b3 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  b2 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  b1 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  b0 = inp(dio)
+	return b7 << 7 | b6 << 6 | b5 << 5 | b4 << 4 | b3 << 3 | b2 << 2 | b1 << 1 | b0
+
+def _readLsb(out, inp, clk, dio, T):
+	spin = _spin
+	# then LSB first, sharing b0
+	c0 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  c1 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  c2 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  c3 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  c4 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  c5 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  c6 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T);  c7 = inp(dio)
+	out(clk, 1);  spin(T);  out(clk, 0);  spin(T)
+	return c7 << 7 | c6 << 6 | c5 << 5 | c4 << 4 | c3 << 3 | c2 << 2 | c1 << 1 | c0
+
+try:
+	from _adc_native import read_byte_msb as _readMsb, read_byte_lsb as _readLsb
+except ImportError:
+	pass
+
+def _bitbangResult(channel):
+	out = _out; inp = _inp
+	clk = _CLK; dio = _DIO; T = _T
+
+	_start(channel)
+	dat1 = _readMsb(out, inp, clk, dio, T)
+	dat2 = _readLsb(out, inp, clk, dio, T)
+	_finish()
+
 	if dat1 == dat2:
 		return dat1
 	else:
-		return 0
+		return -1
 
 def loop():
 	while True:
-		res = getResult()
+		samples = bytearray(getResults(SAMPLES))
+		# no valid sample at all still shows up as a visible 0
+		res = sum(samples) // len(samples) if samples else 0
 		print('res = %d' % res)
 		time.sleep(0.4)
 
@@ -0,0 +1,40 @@
+# cython: language_level=3
+# Native build of the ADC0832 bit-bang sample reads (see ADC0832._readMsb
+# and ADC0832._readLsb, which this module replaces when it is importable).
+#
+# Build it in place, next to ADC0832.py, with:
+#
+#	cythonize -i _adc_native.pyx
+#
+# The loop counter, the bit accumulation and the half-period busy-wait are
+# plain C here; only the GPIO write/read callables are still Python calls.
+
+from posix.time cimport clock_gettime, timespec, CLOCK_MONOTONIC
+
+cdef inline long long _now() noexcept nogil:
+	cdef timespec ts
+	clock_gettime(CLOCK_MONOTONIC, &ts)
+	return ts.tv_sec * 1000000000LL + ts.tv_nsec
+
+cdef inline void _spin(long long ns) noexcept nogil:
+	cdef long long end = _now() + ns
+	while _now() < end:
+		pass
+
+cpdef int read_byte_msb(object out, object inp, int clk, int dio, long long T) except? -1:
+	cdef int i, bit, value = 0
+	for i in range(8):
+		out(clk, 1);  _spin(T)
+		out(clk, 0);  _spin(T)
+		bit = inp(dio)
+		value = value << 1 | (bit & 1)
+	return value
+
+cpdef int read_byte_lsb(object out, object inp, int clk, int dio, long long T) except? -1:
+	cdef int i, bit, value = 0
+	for i in range(8):
+		bit = inp(dio)
+		value |= (bit & 1) << i
+		out(clk, 1);  _spin(T)
+		out(clk, 0);  _spin(T)
+	return value
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# Shared I2C bus handle for the lab scripts.
+#
+# Every module that talks I2C gets the same smbus2.SMBus from get_bus(),
+# so /dev/i2c-1 is opened once per process, and the handle is closed at
+# exit even if the script never reaches its destroy().
+
+import atexit
+
+from smbus2 import SMBus
+
+I2C_BUS = 1
+
+_bus = None
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        _bus = SMBus(I2C_BUS)
+    return _bus
+
+def close_bus():
+    global _bus
+    if _bus is not None:
+        _bus.close()
+        _bus = None
+
+atexit.register(close_bus)